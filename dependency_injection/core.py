@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import abc
+import sys
 from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
 from typing import (
+    TYPE_CHECKING,
     Any,
     AsyncContextManager,
     AsyncIterator,
@@ -12,6 +15,7 @@ from typing import (
     ContextManager,
     Generic,
     Hashable,
+    Iterable,
     Iterator,
     Literal,
     Mapping,
@@ -25,7 +29,7 @@ from typing import (
 )
 
 from dependency_injection.types_match import TypesMatcher, is_type_acceptable_in_place_of
-from dependency_injection.utils import AwaitableValue, get_next_scope
+from dependency_injection.utils import AwaitableValue
 from dependency_injection.validate_containers import (
     validate_async_container,
     validate_container,
@@ -40,23 +44,54 @@ GuardT = TypeVar('GuardT', ContextManager, AsyncContextManager)
 ScopeT = TypeVar('ScopeT', bound=Hashable)
 
 
+class CyclicDependencyError(RecursionError):
+    """
+    Dependency requires itself, directly or via its sub-dependencies.
+    """
+
+
+class _FrozenSlots:
+    """
+    Base of frozen dataclasses with `__slots__`. Default state protocol assigns
+    slots one by one, which frozen dataclass forbids, so `copy` and `pickle`
+    need these.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> list[Any]:
+        return [getattr(self, f.name) for f in fields(self)]
+
+    def __setstate__(self, state: list[Any]) -> None:
+        for f, value in zip(fields(self), state):
+            object.__setattr__(self, f.name, value)
+
+
 @dataclass(frozen=True)
-class CallableFactory(Generic[T_cov]):
+class CallableFactory(_FrozenSlots, Generic[T_cov]):
+    __slots__ = ('create',)
+
     create: Callable[..., T_cov]
 
 
 @dataclass(frozen=True)
-class ContextManagerFactory(Generic[T_cov]):
+class ContextManagerFactory(_FrozenSlots, Generic[T_cov]):
+    __slots__ = ('create',)
+
     create: Callable[..., ContextManager[T_cov]]
 
 
 @dataclass(frozen=True)
-class AsyncCallableFactory(Generic[T_cov]):
+class AsyncCallableFactory(_FrozenSlots, Generic[T_cov]):
+    __slots__ = ('create',)
+
     create: Callable[..., Awaitable[T_cov]]
 
 
 @dataclass(frozen=True)
-class AsyncContextManagerFactory(Generic[T_cov]):
+class AsyncContextManagerFactory(_FrozenSlots, Generic[T_cov]):
+    __slots__ = ('create',)
+
     create: Callable[..., AsyncContextManager[T_cov]]
 
 
@@ -75,6 +110,15 @@ AnyAsyncFactoryWrapper = Union[
 ]
 
 
+# Indexed by `is_async * 2 + is_context_manager`
+_FACTORY_WRAPPERS = (
+    CallableFactory,
+    ContextManagerFactory,
+    AsyncCallableFactory,
+    AsyncContextManagerFactory,
+)
+
+
 @overload
 def _create_factory_wrapper(
     factory: AnySyncFactoryWrapper[T], is_async: Literal[False], is_context_manager: bool
@@ -85,17 +129,34 @@ def _create_factory_wrapper(
 def _create_factory_wrapper(
     factory: AnyAsyncFactoryWrapper[T], is_async: bool, is_context_manager: bool
 ) -> AnyAsyncFactoryWrapper[T]:
-    factory_wrapper_cls = {
-        (False, False): CallableFactory,
-        (False, True): ContextManagerFactory,
-        (True, False): AsyncCallableFactory,
-        (True, True): AsyncContextManagerFactory,
-    }[(is_async, is_context_manager)]
+    factory_wrapper_cls = _FACTORY_WRAPPERS[bool(is_async) * 2 + bool(is_context_manager)]
     return factory_wrapper_cls(create=factory)
 
 
+def _intern(name: str) -> str:
+    # Names are used as memo and plan keys, interned strings are compared by
+    # identity on dict lookups. Subclasses of `str`, like string enums, can't
+    # be interned
+    return sys.intern(name) if type(name) is str else name
+
+
+def _intern_requires(
+    requires: Mapping[str, Union[type[Any], tuple[str, type[Any]]]],
+) -> Mapping[str, Union[type[Any], tuple[str, type[Any]]]]:
+    interned: dict[str, Union[type[Any], tuple[str, type[Any]]]] = {}
+    for arg_name, requirement in requires.items():
+        if isinstance(requirement, tuple):
+            sub_dep_name, sub_dep_type = requirement
+            requirement = (_intern(sub_dep_name), sub_dep_type)
+        # Requirements of other forms are kept as is, like before interning
+        interned[_intern(arg_name)] = requirement
+    return interned
+
+
 @dataclass(frozen=True)
-class BaseDependency(Generic[T_cov]):
+class BaseDependency(_FrozenSlots, Generic[T_cov]):
+    __slots__ = ('name', 'provides_type', 'requires', 'factory')
+
     name: str
     provides_type: type[T_cov]
     requires: Mapping[str, Union[type[Any], tuple[str, type[Any]]]]
@@ -104,6 +165,8 @@ class BaseDependency(Generic[T_cov]):
 
 @dataclass(frozen=True)
 class Dependency(BaseDependency[T_cov]):
+    __slots__ = ()
+
     factory: AnySyncFactoryWrapper[T_cov]
 
     @classmethod
@@ -116,15 +179,17 @@ class Dependency(BaseDependency[T_cov]):
         is_context_manager: bool = False,
     ) -> C:
         return cls(
-            name=name,
+            name=_intern(name),
             provides_type=provides_type,
-            requires=requires,
+            requires=_intern_requires(requires),
             factory=_create_factory_wrapper(factory, False, is_context_manager),
         )
 
 
 @dataclass(frozen=True)
 class AsyncDependency(BaseDependency[T_cov]):
+    __slots__ = ()
+
     @classmethod
     def create(
         cls: type[C],
@@ -136,9 +201,9 @@ class AsyncDependency(BaseDependency[T_cov]):
         is_context_manager: bool = False,
     ) -> C:
         return cls(
-            name=name,
+            name=_intern(name),
             provides_type=provides_type,
-            requires=requires,
+            requires=_intern_requires(requires),
             factory=_create_factory_wrapper(factory, is_async_factory, is_context_manager),
         )
 
@@ -215,6 +280,125 @@ class AsyncImmutableScopedContainers(Generic[ScopeT]):
     scopes: Mapping[ScopeT, AsyncContainer]
 
 
+def _has_finalizers(deps: Iterable[AnyDependency[Any]]) -> bool:
+    return any(
+        isinstance(dep.factory, (ContextManagerFactory, AsyncContextManagerFactory)) for dep in deps
+    )
+
+
+def _freeze_provides(container: AnyCompiledContainer) -> None:
+    # Snapshot as read-only dict with interned keys, so lookups never go
+    # through user mapping type, compare names by identity, and changes of
+    # the source mapping can't invalidate compiled state
+    provides = MappingProxyType({_intern(name): dep for name, dep in container.provides.items()})
+    object.__setattr__(container, 'provides', provides)
+    object.__setattr__(container, 'ids', {name: idx for idx, name in enumerate(provides)})
+    object.__setattr__(container, 'has_finalizers', _has_finalizers(provides.values()))
+
+
+@dataclass(frozen=True)
+class CompiledContainer:
+    """
+    Container which shares resolution plans between all resolvers created for
+    it, see `compile_container`.
+    """
+
+    provides: Mapping[str, Dependency[Any]]
+    provides_unnamed: Sequence[Dependency[Any]] = ()
+    types_matcher: TypesMatcher = is_type_acceptable_in_place_of
+    plans: dict[str, _Plan] = field(default_factory=dict, repr=False, compare=False)
+    # Successful `(look_name, look_type)` lookups, types matcher assumed to be pure
+    lookups: dict[tuple[str, Any], Dependency[Any]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    # Slot of each dependency in resolvers memo
+    ids: Mapping[str, int] = field(init=False, repr=False, compare=False)
+    # Whether any dependency registers finalizers, resolvers skip exit stack otherwise
+    has_finalizers: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        _freeze_provides(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Read-only view can't be pickled, compiled state is rebuilt on demand
+        return type(self), (dict(self.provides), self.provides_unnamed, self.types_matcher)
+
+    @classmethod
+    def from_container(cls, container: Container) -> CompiledContainer:
+        if isinstance(container, cls):
+            return container
+        return cls(
+            provides=container.provides,
+            provides_unnamed=container.provides_unnamed,
+            types_matcher=container.types_matcher,
+        )
+
+
+@dataclass(frozen=True)
+class AsyncCompiledContainer:
+    """
+    Container which shares resolution plans between all async resolvers created
+    for it, see `compile_async_container`.
+    """
+
+    provides: Mapping[str, AsyncDependency[Any]]
+    provides_unnamed: Sequence[AsyncDependency[Any]] = ()
+    types_matcher: TypesMatcher = is_type_acceptable_in_place_of
+    plans: dict[str, _Plan] = field(default_factory=dict, repr=False, compare=False)
+    # Successful `(look_name, look_type)` lookups, types matcher assumed to be pure
+    lookups: dict[tuple[str, Any], AsyncDependency[Any]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    # Slot of each dependency in resolvers memo
+    ids: Mapping[str, int] = field(init=False, repr=False, compare=False)
+    # Whether any dependency registers finalizers, resolvers skip exit stack otherwise
+    has_finalizers: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        _freeze_provides(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Read-only view can't be pickled, compiled state is rebuilt on demand
+        return type(self), (dict(self.provides), self.provides_unnamed, self.types_matcher)
+
+    @classmethod
+    def from_container(cls, container: AsyncContainer) -> AsyncCompiledContainer:
+        if isinstance(container, cls):
+            return container
+        return cls(
+            provides=container.provides,
+            provides_unnamed=container.provides_unnamed,
+            types_matcher=container.types_matcher,
+        )
+
+
+AnyCompiledContainer = Union[CompiledContainer, AsyncCompiledContainer]
+
+
+def compile_container(container: Container) -> CompiledContainer:
+    """
+    Validate container once and prepare it to be used by many resolvers, like
+    a resolver per request. Resolvers created for compiled container skips
+    validation and reuse resolution plans.
+    """
+    if isinstance(container, CompiledContainer):
+        return container
+
+    validate_container(container)
+    return CompiledContainer.from_container(container)
+
+
+def compile_async_container(container: AsyncContainer) -> AsyncCompiledContainer:
+    """
+    Same as `compile_container`, but for async containers.
+    """
+    if isinstance(container, AsyncCompiledContainer):
+        return container
+
+    validate_async_container(container)
+    return AsyncCompiledContainer.from_container(container)
+
+
 AnyContainersStack = Union[ScopedContainers[ScopeT], ScopedAsyncContainers[ScopeT]]
 
 
@@ -260,47 +444,231 @@ class _AsyncResolve(Protocol):
 _AnyResolve = Union[_Resolve, _AsyncResolve]
 
 
+class _Creator(Protocol):
+    def __call__(
+        self,
+        finalizers_stack: Any,
+        factory: AnyAsyncFactoryWrapper[T],
+        dep_args: dict[str, Any],
+    ) -> Union[T, Awaitable[T]]:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class _PlanStep:
+    """
+    Creates dependency provided by the container.
+    """
+
+    id: int
+    dep: AnyDependency[Any]
+    # Flat snapshot of `dep.requires` as `(arg_name, value_id, is_external)`
+    # items. Value id is memo slot of sub-dependency provided by the same
+    # container, or id of external step otherwise, both steps always precede
+    # this one
+    args: tuple[tuple[str, int, bool], ...]
+    # Creator function chosen once for the dependency factory kind
+    create: _Creator
+
+
+@dataclass(frozen=True)
+class _ExternalStep:
+    """
+    Resolves requirement which isn't provided by the container (or doesn't
+    match required type) via the unknown resolver.
+    """
+
+    # Memo slot of dependency which requires it, step is skipped if the
+    # dependency is already created
+    consumer_id: int
+    id: int
+    name: str
+    type: type[Any]
+
+
+# Steps go in the order dependencies would be created by recursive
+# resolution, so external requirements are resolved at their declaration
+# position among sub-dependencies
+_Plan = tuple[Union[_PlanStep, _ExternalStep], ...]
+
+
+def _pick_creator(creators: Mapping[type[Any], _Creator], dep: AnyDependency[Any]) -> _Creator:
+    # Factory wrapper class is the factory kind tag, so its exact type is looked
+    # up first and subclasses of wrappers are matched by `isinstance`
+    create = creators.get(type(dep.factory))
+    if create is not None:
+        return create
+    for factory_cls, create in creators.items():
+        if isinstance(dep.factory, factory_cls):
+            return create
+    raise TypeError(f'Unexpected dependency factory for dependency {dep!r}')
+
+
+def _types_match(container: AnyContainer, provides_type: type[Any], look_type: type[Any]) -> bool:
+    # Default matcher always accepts type in place of itself, don't even call it
+    if provides_type is look_type and container.types_matcher is is_type_acceptable_in_place_of:
+        return True
+    return container.types_matcher(provides_type, look_type)
+
+
+def _build_plan(
+    container: AnyCompiledContainer,
+    root_name: str,
+    root: AnyDependency[Any],
+    creators: Mapping[type[Any], _Creator],
+    ensure_dep_kind: Callable[[AnyDependency[Any]], Any],
+) -> _Plan:
+    """
+    Order dependency and all of it's sub-dependencies, provided by the same
+    container, topologically, so each of them could be created in turn, without
+    recursion.
+
+    Sub-dependencies which are not provided by the container (or doesn't match
+    required type) are left for the unknown resolver, but in the same order.
+    """
+    steps: list[Union[_PlanStep, _ExternalStep]] = []
+    planned: set[str] = set()
+    visiting: set[str] = {root_name}
+    # Each stack frame holds dependency name, dependency, iterator over its
+    # requirements and arguments of its plan step collected so far
+    stack: list[tuple[str, AnyDependency[Any], Iterator[Any], list[Any]]] = [
+        (root_name, root, iter(root.requires.items()), [])
+    ]
+    while stack:
+        name, dep, sub_deps, dep_args = stack[-1]
+        for arg_name, (sub_dep_name, sub_dep_type) in sub_deps:
+            sub_dep = container.provides.get(sub_dep_name)
+            if sub_dep is None or not _types_match(container, sub_dep.provides_type, sub_dep_type):
+                external_id = len(steps)
+                steps.append(
+                    _ExternalStep(container.ids[name], external_id, sub_dep_name, sub_dep_type)
+                )
+                dep_args.append((arg_name, external_id, True))
+                continue
+
+            dep_args.append((arg_name, container.ids[sub_dep_name], False))
+            if sub_dep_name in planned:
+                continue
+            if sub_dep_name in visiting:
+                cycle = [frame[0] for frame in stack]
+                cycle = cycle[cycle.index(sub_dep_name) :] + [sub_dep_name]
+                raise CyclicDependencyError(
+                    f'Dependency `{sub_dep_name}` cyclically depends on itself: '
+                    + ' -> '.join(f'`{cycle_name}`' for cycle_name in cycle)
+                )
+
+            # Same check as for dependencies looked up by resolver directly
+            ensure_dep_kind(sub_dep)
+            visiting.add(sub_dep_name)
+            stack.append((sub_dep_name, sub_dep, iter(sub_dep.requires.items()), []))
+            break
+        else:
+            stack.pop()
+            visiting.discard(name)
+            planned.add(name)
+            steps.append(
+                _PlanStep(container.ids[name], dep, tuple(dep_args), _pick_creator(creators, dep))
+            )
+
+    return tuple(steps)
+
+
+_MISSING: Any = object()
+# Arguments of dependencies without requirements, creators never mutate it
+_NO_ARGS: dict[str, Any] = {}
+
+
 class BaseResolver(Generic[GuardT], abc.ABC):
+    __slots__ = (
+        'guard',
+        '_container',
+        '_resolve_unknown',
+        '_resolved_cache',
+        '_plans',
+        '_lookups',
+    )
+
+    # Creator function per factory wrapper class, which are supported by resolver
+    _creators: Mapping[type[Any], _Creator]
+
     guard: GuardT
-    finalizers_stack: Union[_HasEnterContextManager, _HasEnterAsyncContextManager]
-    _container: AnyContainer
+    _container: AnyCompiledContainer
     _resolve_unknown: Optional[_AnyResolve]
-    _resolved_cache: dict[str, Any]
+    _resolved_cache: list[Any]
+    _plans: dict[str, _Plan]
+    _lookups: dict[tuple[str, Any], Any]
+
+    @property
+    def finalizers_stack(self) -> Union[_HasEnterContextManager, _HasEnterAsyncContextManager]:
+        guard = self.guard
+        if isinstance(guard, _LazyFinalizers):
+            return guard.get_stack()
+        return guard
 
     def resolve(self, look_name: Optional[str], look_type: type[T]) -> Union[T, Awaitable[T]]:
+        # Lookups cache is probed inline, as this is the most executed path
+        lookup_key: Optional[tuple[Optional[str], type[T]]] = (look_name, look_type)
+        try:
+            dep = self._lookups.get(lookup_key)
+        except TypeError:
+            # Unhashable type, like `Annotated` with dict metadata, isn't cached
+            dep = lookup_key = None
+        if dep is None:
+            try:
+                dep = self._lookup_dep(look_name, look_type)
+            except LookupError as exc:
+                if self._resolve_unknown is None:
+                    raise
+
+                try:
+                    # Try to recover via unknown resolver
+                    return self._resolve_unknown(look_name, look_type)
+                except LookupError as ru_exc:
+                    raise ru_exc from exc
+
+            if lookup_key is not None:
+                self._lookups[lookup_key] = dep
+
+        return self._resolve_dep(look_name, dep)
+
+    def _resolve_external(self, look_name: str, look_type: type[T]) -> Union[T, Awaitable[T]]:
+        """
+        Resolve requirement which plan found not to be provided by container.
+        """
+        if self._resolve_unknown is None:
+            # Fails with proper lookup error
+            return self.resolve(look_name, look_type)
+        # Skip lookup, so lookup error isn't created and formatted only to be
+        # caught, which is common for requirements provided by outer scopes
         try:
-            dep = self._lookup_dep(look_name, look_type)
+            return self._resolve_unknown(look_name, look_type)
         except LookupError as exc:
-            if self._resolve_unknown is None:
-                raise
+            # Keep the cause `resolve` would chain from own failed lookup
+            raise exc from LookupError(
+                f'Dependency `{look_name}: {look_type}` not provided by container'
+            )
 
-            try:
-                # Try to recover via unknown resolver
-                return self._resolve_unknown(look_name, look_type)
-            except LookupError as ru_exc:
-                raise ru_exc from exc
+    def _get_plan(self, name: str, dep: AnyDependency[Any]) -> _Plan:
+        plan = self._plans.get(name)
+        if plan is None:
+            plan = self._plans[name] = _build_plan(
+                self._container, name, dep, self._creators, self._ensure_dep_kind
+            )
+        return plan
 
-        try:
-            # TODO can't validate cached value type
-            memoized_value = self._resolved_cache[dep.name]
-            return cast(Union[T, Awaitable[T]], memoized_value)
-        except LookupError:
-            pass
-
-        # TODO check for cyclic dependencies
-        dep_args = {
-            arg_name: self.resolve(sub_dep_name, sub_dep_type)
-            for arg_name, (sub_dep_name, sub_dep_type) in dep.requires.items()
-        }
-        return self._create(dep, **dep_args)
+    def _resolve_dep(self, name: str, dep: AnyDependency[T]) -> Union[T, Awaitable[T]]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _ensure_dep_kind(dep: AnyDependency[T]) -> AnyDependency[T]:
+        raise NotImplementedError
 
     def _lookup_dep(self, look_name: str, look_type: type[T]) -> AnyDependency[T]:
-        not_found = look_name not in self._container.provides
-        if not_found:
+        maybe_dep = self._container.provides.get(look_name)
+        if maybe_dep is None:
             raise LookupError(f'Dependency `{look_name}: {look_type}` not found')
 
-        maybe_dep = self._container.provides[look_name]
-        if not self._container.types_matcher(maybe_dep.provides_type, look_type):
+        if not _types_match(self._container, maybe_dep.provides_type, look_type):
             raise LookupError(
                 f"Requested dependency `{look_name}: {look_type}` doesn't "
                 f'matches provided type {maybe_dep.provides_type}'
@@ -309,9 +677,6 @@ class BaseResolver(Generic[GuardT], abc.ABC):
         dep: AnyDependency[T] = maybe_dep
         return dep
 
-    def _create(self, dep: AnyDependency[T], **dep_args: Any) -> Union[T, Awaitable[T]]:
-        raise NotImplementedError
-
 
 class _BaseResolverFactory(Protocol[GuardT]):
     def __call__(
@@ -334,20 +699,31 @@ class BaseScopedResolver(Generic[GuardT, ScopeT], abc.ABC):
         parent: Union[ScopedResolver[GuardT, ScopeT], ScopedAsyncResolver[GuardT, ScopeT]] = None,
         scope: Optional[ScopeT] = None,
     ):
-        new_scope = get_next_scope(
-            scoped_containers.scopes_order, None if parent is None else parent.scope
-        )
-        resolve_unknown = None if parent is None else parent.resolve
+        # Parent already knows its position, so don't search it in scopes order
+        position = 0 if parent is None else parent._scope_position + 1
+        if position >= len(scoped_containers.scopes_order):
+            raise ValueError('No next scope available for given scoped containers')
+        new_scope = scoped_containers.scopes_order[position]
         if scope is not None and new_scope != scope:
             raise ValueError(
                 f'Could not enter given scope "{scope}", ' f'only "{new_scope}" is possible'
             )
         self._scope = new_scope
+        if parent is None:
+            self._scope_owners: tuple[BaseScopedResolver[GuardT, ScopeT], ...] = (self,)
+            self._scopes_index = _build_scopes_index(scoped_containers)
+        else:
+            # Resolvers owning each of the entered scopes, indexed by scope position
+            self._scope_owners = parent._scope_owners + (self,)
+            # Index is built once per scoped containers and shared by all child scopes
+            self._scopes_index = parent._scopes_index
+        self._scope_position = position
 
         container = scoped_containers.scopes[self._scope]
         # Owned resolver is required to avid mixin-usages
         self._owned_resolver: BaseResolver[GuardT] = self._owned_resolver_factory(
-            container=container, resolve_unknown=resolve_unknown
+            container=container,
+            resolve_unknown=None if parent is None else self._resolve_outer,
         )
         self._scoped_containers = scoped_containers
 
@@ -360,67 +736,166 @@ class BaseScopedResolver(Generic[GuardT, ScopeT], abc.ABC):
         return self._owned_resolver.guard
 
     def resolve(self, look_name: str, look_type: type[T]) -> Union[T, Awaitable[T]]:
-        return self._owned_resolver.resolve(look_name, look_type)
+        positions = self._scopes_index.get(look_name, ())
+        if self._scope_position in positions:
+            return self._owned_resolver.resolve(look_name, look_type)
+        return self._resolve_outer(look_name, look_type)
+
+    def _resolve_outer(self, look_name: str, look_type: type[T]) -> Union[T, Awaitable[T]]:
+        """
+        Resolve dependency directly via the nearest outer scope which provides
+        it, without asking each of the intermediate scopes.
+        """
+        for position in self._scopes_index.get(look_name, ()):
+            if position < self._scope_position:
+                owner = self._scope_owners[position]
+                return owner._owned_resolver.resolve(look_name, look_type)
+
+        raise LookupError(f'Dependency `{look_name}: {look_type}` not found')
+
+
+def _build_scopes_index(scoped_containers: AnyContainersStack[Any]) -> dict[str, tuple[int, ...]]:
+    """
+    Map each dependency name onto positions of the scopes providing it, the
+    innermost scope goes first.
+    """
+    index: dict[str, list[int]] = {}
+    scopes_order = scoped_containers.scopes_order
+    for position in reversed(range(len(scopes_order))):
+        for name in scoped_containers.scopes[scopes_order[position]].provides:
+            positions = index.get(name)
+            if positions is None:
+                index[name] = [position]
+            else:
+                positions.append(position)
+    return {name: tuple(positions) for name, positions in index.items()}
+
+
+def _call_factory(
+    finalizers_stack: _HasEnterContextManager,
+    factory: CallableFactory[T],
+    dep_args: dict[str, Any],
+) -> T:
+    return factory.create(**dep_args)
 
 
-def _create_dependency_sync(
+def _enter_factory_context(
     finalizers_stack: _HasEnterContextManager,
-    dep: Dependency[T],
-    **dep_args: Any,
+    factory: ContextManagerFactory[T],
+    dep_args: dict[str, Any],
 ) -> T:
-    if isinstance(dep.factory, CallableFactory):
-        return dep.factory.create(**dep_args)
-    elif isinstance(dep.factory, ContextManagerFactory):
-        value = dep.factory.create(**dep_args)
-        return finalizers_stack.enter_context(value)
-    else:
-        raise TypeError(f'Unexpected dependency factory for dependency {dep!r}')
+    return finalizers_stack.enter_context(factory.create(**dep_args))
 
 
-async def _create_dependency_async(
+async def _call_factory_async(
     finalizers_stack: _HasEnterAsyncContextManager,
-    dep: AsyncDependency[T],
-    **dep_args: Awaitable[Any],
+    factory: CallableFactory[T],
+    dep_args: dict[str, Any],
 ) -> T:
-    ready_sub_deps = {
-        sub_dep_name: await sub_dep_awaitable
-        for sub_dep_name, sub_dep_awaitable in dep_args.items()
-    }
-
-    if isinstance(dep.factory, (CallableFactory, ContextManagerFactory)):
-        return _create_dependency_sync(
-            finalizers_stack,
-            dep.as_sync_dependency(),
-            **ready_sub_deps,
-        )
-    if isinstance(dep.factory, AsyncCallableFactory):
-        return await dep.factory.create(**ready_sub_deps)
-    elif isinstance(dep.factory, AsyncContextManagerFactory):
-        context_manager = dep.factory.create(**ready_sub_deps)
-        return await finalizers_stack.enter_async_context(context_manager)
-    else:
-        raise TypeError(f'Unexpected dependency factory for dependency {dep!r}')
+    return factory.create(**dep_args)
+
+
+async def _enter_factory_context_async(
+    finalizers_stack: _HasEnterAsyncContextManager,
+    factory: ContextManagerFactory[T],
+    dep_args: dict[str, Any],
+) -> T:
+    return finalizers_stack.enter_context(factory.create(**dep_args))
+
+
+async def _await_factory(
+    finalizers_stack: _HasEnterAsyncContextManager,
+    factory: AsyncCallableFactory[T],
+    dep_args: dict[str, Any],
+) -> T:
+    return await factory.create(**dep_args)
+
+
+async def _enter_factory_async_context(
+    finalizers_stack: _HasEnterAsyncContextManager,
+    factory: AsyncContextManagerFactory[T],
+    dep_args: dict[str, Any],
+) -> T:
+    return await finalizers_stack.enter_async_context(factory.create(**dep_args))
+
+
+class _LazyFinalizers:
+    """
+    Guard of resolvers which dependencies never register finalizers. Exit stack
+    is created only when finalizers stack is requested, e.g. to register custom
+    callbacks, instead of creating and entering one per resolver.
+    """
+
+    __slots__ = ('_stack_factory', '_stack')
+
+    def __init__(self, stack_factory: Callable[[], Any]):
+        self._stack_factory = stack_factory
+        self._stack: Any = None
+
+    def get_stack(self) -> Any:
+        if self._stack is None:
+            self._stack = self._stack_factory()
+        return self._stack
+
+    # Entering exit stacks does nothing, so stack created while guard is
+    # entered needs only to be exited
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info: Any) -> Optional[bool]:
+        if self._stack is None:
+            return None
+        return self._stack.__exit__(*exc_info)
+
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(self, *exc_info: Any) -> Optional[bool]:
+        if self._stack is None:
+            return None
+        return await self._stack.__aexit__(*exc_info)
+
+
+_SYNC_CREATORS: Mapping[type[Any], _Creator] = {
+    CallableFactory: _call_factory,
+    ContextManagerFactory: _enter_factory_context,
+}
+_ASYNC_CREATORS: Mapping[type[Any], _Creator] = {
+    CallableFactory: _call_factory_async,
+    ContextManagerFactory: _enter_factory_context_async,
+    AsyncCallableFactory: _await_factory,
+    AsyncContextManagerFactory: _enter_factory_async_context,
+}
 
 
 class Resolver(BaseResolver[ContextManager[None]]):
+    __slots__ = ()
+
+    _creators = _SYNC_CREATORS
+
     def __init__(
         self,
         container: Container,
         resolve_unknown: Optional[_Resolve] = None,
     ):
-        self._container = container
-        self._resolved_cache: dict[str, Any] = {}
+        self._container = CompiledContainer.from_container(container)
+        self._resolved_cache: list[Any] = [_MISSING] * len(self._container.ids)
+        self._plans = self._container.plans
+        self._lookups = self._container.lookups
         self._resolve_unknown = resolve_unknown
-        self.guard = self.finalizers_stack = ExitStack()
+        self.guard = ExitStack() if self._container.has_finalizers else _LazyFinalizers(ExitStack)
 
-    def resolve(self, look_name: Optional[str], look_type: type[T]) -> T:
-        return cast(
-            T,
-            super().resolve(look_name, look_type),
-        )
+    if TYPE_CHECKING:
+        # Only narrows return type, avoids extra call on the hot path at runtime
+        def resolve(self, look_name: Optional[str], look_type: type[T]) -> T:
+            ...
 
     def _lookup_dep(self, look_name: str, look_type: type[T]) -> Dependency[T]:
-        dep = super()._lookup_dep(look_name, look_type)
+        return self._ensure_dep_kind(super()._lookup_dep(look_name, look_type))
+
+    @staticmethod
+    def _ensure_dep_kind(dep: AnyDependency[T]) -> Dependency[T]:
         if not isinstance(dep, Dependency):
             raise RuntimeError(
                 f"Unexpected condition: sync resolver received dependency of other type {dep!r}"
@@ -428,36 +903,68 @@ class Resolver(BaseResolver[ContextManager[None]]):
 
         return dep
 
-    def _create(self, dep: AnyDependency[T], **dep_args: Any) -> T:
-        if not isinstance(dep, Dependency):
-            raise RuntimeError(
-                f"Unexpected condition: sync resolver received dependency of other type {dep!r}"
-            )
+    def _resolve_dep(self, name: str, dep: AnyDependency[T]) -> T:
+        # TODO can't validate cached value type
+        value = self._resolved_cache[self._container.ids[name]]
+        if value is _MISSING:
+            value = self._create_planned(self._get_plan(name, dep))
+        return value
 
-        created = _create_dependency_sync(self.finalizers_stack, dep, **dep_args)
-        self._resolved_cache[dep.name] = created
-        return created
+    def _create_planned(self, plan: _Plan) -> T:
+        resolved = self._resolved_cache
+        externals: dict[int, Any] = {}
+        for step in plan:
+            if isinstance(step, _ExternalStep):
+                if resolved[step.consumer_id] is _MISSING:
+                    externals[step.id] = self._resolve_external(step.name, step.type)
+                continue
+            if resolved[step.id] is not _MISSING:
+                continue
+
+            if not step.args:
+                # Leaf dependency, most common case
+                dep_args = _NO_ARGS
+            else:
+                dep_args = {}
+                for arg_name, value_id, is_external in step.args:
+                    dep_args[arg_name] = externals[value_id] if is_external else resolved[value_id]
+            # Guard is the finalizers stack itself if any factory registers
+            # finalizers, other creators don't use it
+            resolved[step.id] = step.create(self.guard, step.dep.factory, dep_args)
+        return resolved[plan[-1].id]
 
 
 class AsyncResolver(BaseResolver[AsyncContextManager[None]]):
+    __slots__ = ('_awaitables',)
+
+    _creators = _ASYNC_CREATORS
+
     def __init__(
         self,
         container: AsyncContainer,
         resolve_unknown: Optional[_AsyncResolve] = None,
     ):
-        self._container = container
-        self._resolved_cache: dict[str, Any] = {}
+        self._container = AsyncCompiledContainer.from_container(container)
+        self._resolved_cache: list[Any] = [_MISSING] * len(self._container.ids)
+        # Awaitables returned for memoized values, created on first memo hit
+        self._awaitables: list[Optional[AwaitableValue[Any]]] = [None] * len(self._container.ids)
+        self._plans = self._container.plans
+        self._lookups = self._container.lookups
         self._resolve_unknown = resolve_unknown
-        self.guard = self.finalizers_stack = AsyncExitStack()
-
-    def resolve(self, look_name: Optional[str], look_type: type[T]) -> Awaitable[T]:
-        return cast(
-            Awaitable[T],
-            super().resolve(look_name, look_type),
+        self.guard = (
+            AsyncExitStack() if self._container.has_finalizers else _LazyFinalizers(AsyncExitStack)
         )
 
+    if TYPE_CHECKING:
+        # Only narrows return type, avoids extra call on the hot path at runtime
+        def resolve(self, look_name: Optional[str], look_type: type[T]) -> Awaitable[T]:
+            ...
+
     def _lookup_dep(self, look_name: str, look_type: type[T]) -> AsyncDependency[T]:
-        dep = super()._lookup_dep(look_name, look_type)
+        return self._ensure_dep_kind(super()._lookup_dep(look_name, look_type))
+
+    @staticmethod
+    def _ensure_dep_kind(dep: AnyDependency[T]) -> AsyncDependency[T]:
         if not isinstance(dep, AsyncDependency):
             raise RuntimeError(
                 f"Unexpected condition: async resolver received dependency of other type {dep!r}"
@@ -465,21 +972,79 @@ class AsyncResolver(BaseResolver[AsyncContextManager[None]]):
 
         return dep
 
-    async def _create(self, dep: AnyDependency[T], **dep_args: Any) -> T:
-        if any(not isinstance(dep, Awaitable) for dep in dep_args.values()):
-            raise RuntimeError(
-                f"Unexpected condition: not all arguments for "
-                f"async dependency is awaitables {dep_args!r}"
-            )
-
-        if not isinstance(dep, AsyncDependency):
-            raise RuntimeError(
-                f"Unexpected condition: async resolver received dependency of other type {dep!r}"
-            )
-
-        value = await _create_dependency_async(self.finalizers_stack, dep, **dep_args)
-        self._resolved_cache[dep.name] = AwaitableValue(value)
-        return value
+    def _resolve_dep(self, name: str, dep: AnyDependency[T]) -> Awaitable[T]:
+        # TODO can't validate cached value type
+        dep_id = self._container.ids[name]
+        awaitable = self._awaitables[dep_id]
+        if awaitable is not None:
+            return awaitable
+
+        value = self._resolved_cache[dep_id]
+        if value is _MISSING:
+            return self._create_planned(self._get_plan(name, dep))
+        # Memoized values are stored as is, so they could be passed to
+        # factories without awaiting, and wrapped only once for callers
+        awaitable = self._awaitables[dep_id] = AwaitableValue(value)
+        return awaitable
+
+    async def _create_planned(self, plan: _Plan) -> T:
+        resolved = self._resolved_cache
+        externals: dict[int, Any] = {}
+        for step in plan:
+            if isinstance(step, _ExternalStep):
+                if resolved[step.consumer_id] is _MISSING:
+                    externals[step.id] = await self._resolve_external(step.name, step.type)
+                continue
+            if resolved[step.id] is not _MISSING:
+                continue
+
+            if not step.args:
+                # Leaf dependency, most common case
+                dep_args = _NO_ARGS
+            else:
+                dep_args = {}
+                for arg_name, value_id, is_external in step.args:
+                    dep_args[arg_name] = externals[value_id] if is_external else resolved[value_id]
+            # Guard is the finalizers stack itself if any factory registers
+            # finalizers, other creators don't use it
+            resolved[step.id] = await step.create(self.guard, step.dep.factory, dep_args)
+        return resolved[plan[-1].id]
+
+
+class _ScopeContextManager(Generic[C]):
+    """
+    Enters scoped resolver guard and returns the resolver itself.
+    """
+
+    __slots__ = ('_resolver',)
+
+    def __init__(self, resolver: C):
+        self._resolver = resolver
+
+    def __enter__(self) -> C:
+        self._resolver.guard.__enter__()
+        return self._resolver
+
+    def __exit__(self, *exc_info: Any) -> Optional[bool]:
+        return self._resolver.guard.__exit__(*exc_info)
+
+
+class _AsyncScopeContextManager(Generic[C]):
+    """
+    Async version of `_ScopeContextManager`.
+    """
+
+    __slots__ = ('_resolver',)
+
+    def __init__(self, resolver: C):
+        self._resolver = resolver
+
+    async def __aenter__(self) -> C:
+        await self._resolver.guard.__aenter__()
+        return self._resolver
+
+    async def __aexit__(self, *exc_info: Any) -> Optional[bool]:
+        return await self._resolver.guard.__aexit__(*exc_info)
 
 
 class ScopedResolver(
@@ -496,11 +1061,10 @@ class ScopedResolver(
     ):
         super().__init__(scoped_containers, parent=parent, scope=scope)
 
-    def resolve(self, look_name: str, look_type: type[T]) -> T:
-        return cast(
-            T,
-            super().resolve(look_name, look_type),
-        )
+    if TYPE_CHECKING:
+        # Only narrows return type, avoids extra call on the hot path at runtime
+        def resolve(self, look_name: str, look_type: type[T]) -> T:
+            ...
 
     def next_scope(self, scope: Optional[ScopeT] = None) -> ContextManager[ScopedResolver[ScopeT]]:
         child_resolver = ScopedResolver(
@@ -508,13 +1072,7 @@ class ScopedResolver(
             parent=self,
             scope=scope,
         )
-
-        @contextmanager
-        def cm():
-            with child_resolver.guard:
-                yield child_resolver
-
-        return cm()
+        return _ScopeContextManager(child_resolver)
 
 
 class ScopedAsyncResolver(
@@ -523,11 +1081,10 @@ class ScopedAsyncResolver(
 ):
     _owned_resolver_factory = AsyncResolver
 
-    def resolve(self, look_name: str, look_type: type[T]) -> Awaitable[T]:
-        return cast(
-            Awaitable[T],
-            super().resolve(look_name, look_type),
-        )
+    if TYPE_CHECKING:
+        # Only narrows return type, avoids extra call on the hot path at runtime
+        def resolve(self, look_name: str, look_type: type[T]) -> Awaitable[T]:
+            ...
 
     def next_scope(
         self, scope: Optional[ScopeT] = None
@@ -537,20 +1094,12 @@ class ScopedAsyncResolver(
             parent=self,
             scope=scope,
         )
-
-        @asynccontextmanager
-        async def cm():
-            async with child_resolver.guard:
-                yield child_resolver
-
-        return cm()
+        return _AsyncScopeContextManager(child_resolver)
 
 
 @contextmanager
 def create_resolver(container: Container) -> Iterator[Resolver]:
-    validate_container(container)
-
-    resolver = Resolver(container)
+    resolver = Resolver(compile_container(container))
     with resolver.guard:
         yield resolver
 
@@ -561,7 +1110,17 @@ def create_scoped_resolver(
 ) -> Iterator[ScopedResolver]:
     validate_scoped_containers(scoped_containers)
 
-    resolver = ScopedResolver(scoped_containers)
+    # Compile each scope container once, so resolvers of all nested scopes
+    # entered later share resolution plans
+    resolver = ScopedResolver(
+        ImmutableScopedContainers(
+            scoped_containers.scopes_order,
+            {
+                scope: CompiledContainer.from_container(container)
+                for scope, container in scoped_containers.scopes.items()
+            },
+        )
+    )
     with resolver.guard:
         yield resolver
 
@@ -570,9 +1129,7 @@ def create_scoped_resolver(
 async def create_async_resolver(
     container: AsyncContainer,
 ) -> AsyncIterator[AsyncResolver]:
-    validate_async_container(container)
-
-    resolver = AsyncResolver(container)
+    resolver = AsyncResolver(compile_async_container(container))
     async with resolver.guard:
         yield resolver
 
@@ -583,6 +1140,16 @@ async def create_scoped_async_resolver(
 ) -> AsyncIterator[AsyncResolver]:
     validate_scoped_async_containers(scoped_containers)
 
-    resolver = ScopedAsyncResolver(scoped_containers)
+    # Compile each scope container once, so resolvers of all nested scopes
+    # entered later share resolution plans
+    resolver = ScopedAsyncResolver(
+        AsyncImmutableScopedContainers(
+            scoped_containers.scopes_order,
+            {
+                scope: AsyncCompiledContainer.from_container(container)
+                for scope, container in scoped_containers.scopes.items()
+            },
+        )
+    )
     async with resolver.guard:
         yield resolver
@@ -1,103 +1,92 @@
 import abc
-from typing import (
-    AbstractSet,
-    AsyncContextManager,
-    AsyncGenerator,
-    AsyncIterable,
-    AsyncIterator,
-    Awaitable,
-    ByteString,
-    ChainMap,
-    Collection,
-    Container,
-    ContextManager,
-    Coroutine,
-    Counter,
-    DefaultDict,
-    Deque,
-    Dict,
-    FrozenSet,
-    Generator,
-    Hashable,
-    ItemsView,
-    Iterable,
-    Iterator,
-    KeysView,
-    List,
-    Mapping,
-    MappingView,
-    MutableMapping,
-    MutableSequence,
-    MutableSet,
-    NamedTuple,
-    OrderedDict,
-    Protocol,
-    Reversible,
-    Sequence,
-    Set,
-    Sized,
-    SupportsAbs,
-    SupportsBytes,
-    SupportsComplex,
-    SupportsFloat,
-    SupportsIndex,
-    SupportsInt,
-    SupportsRound,
-    Type,
-    TypedDict,
-    ValuesView,
-    get_origin,
+import typing
+from functools import lru_cache, wraps
+from typing import Any, Callable, Protocol, Type, TypeVar, get_origin
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+# Looked up by name, since some of them are deprecated or gone in newer Python
+# versions
+_STD_ALIASES_NAMES = (
+    'Protocol',
+    'AbstractSet',
+    'ByteString',
+    'Container',
+    'ContextManager',
+    'Hashable',
+    'ItemsView',
+    'Iterable',
+    'Iterator',
+    'KeysView',
+    'Mapping',
+    'MappingView',
+    'MutableMapping',
+    'MutableSequence',
+    'MutableSet',
+    'Sequence',
+    'Sized',
+    'ValuesView',
+    'Awaitable',
+    'AsyncIterator',
+    'AsyncIterable',
+    'Coroutine',
+    'Collection',
+    'AsyncGenerator',
+    'AsyncContextManager',
+    'Reversible',
+    'SupportsAbs',
+    'SupportsBytes',
+    'SupportsComplex',
+    'SupportsFloat',
+    'SupportsIndex',
+    'SupportsInt',
+    'SupportsRound',
+    'ChainMap',
+    'Counter',
+    'Deque',
+    'Dict',
+    'DefaultDict',
+    'List',
+    'OrderedDict',
+    'Set',
+    'FrozenSet',
+    'NamedTuple',
+    'TypedDict',
+    'Generator',
 )
+_ALL_STD_ALIASES = frozenset(
+    getattr(typing, name) for name in _STD_ALIASES_NAMES if hasattr(typing, name)
+)
+
+
+def _memoize(maxsize: int) -> Callable[[F], F]:
+    """
+    `lru_cache` which computes result without caching for unhashable
+    arguments, like `Annotated` with dict metadata.
+    """
+
+    def decorator(func: F) -> F:
+        cached_func = lru_cache(maxsize=maxsize)(func)
+
+        @wraps(func)
+        def wrapper(*args: Any) -> Any:
+            try:
+                return cached_func(*args)
+            except TypeError:
+                try:
+                    hash(args)
+                except TypeError:
+                    return func(*args)
+                raise
 
-_ALL_STD_ALIASES = [
-    Protocol,
-    AbstractSet,
-    ByteString,
-    Container,
-    ContextManager,
-    Hashable,
-    ItemsView,
-    Iterable,
-    Iterator,
-    KeysView,
-    Mapping,
-    MappingView,
-    MutableMapping,
-    MutableSequence,
-    MutableSet,
-    Sequence,
-    Sized,
-    ValuesView,
-    Awaitable,
-    AsyncIterator,
-    AsyncIterable,
-    Coroutine,
-    Collection,
-    AsyncGenerator,
-    AsyncContextManager,
-    Reversible,
-    SupportsAbs,
-    SupportsBytes,
-    SupportsComplex,
-    SupportsFloat,
-    SupportsIndex,
-    SupportsInt,
-    SupportsRound,
-    ChainMap,
-    Counter,
-    Deque,
-    Dict,
-    DefaultDict,
-    List,
-    OrderedDict,
-    Set,
-    FrozenSet,
-    NamedTuple,
-    TypedDict,
-    Generator,
-]
+        wrapper.cache_info = cached_func.cache_info  # type: ignore[attr-defined]
+        wrapper.cache_clear = cached_func.cache_clear  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
 
+    return decorator
 
+
+@_memoize(maxsize=512)
 def is_user_st_protocol(t: Type) -> bool:
     t_orig = get_origin(t) or t
     if t_orig in _ALL_STD_ALIASES:
@@ -105,13 +94,15 @@ def is_user_st_protocol(t: Type) -> bool:
     return issubclass(t_orig, Protocol) and not is_abc(t)
 
 
+@_memoize(maxsize=512)
 def is_user_st_runtime_protocol(t: Type) -> bool:
-    t_orig = get_origin(t) or t
+    # Cached check goes first, origin is only needed for actual protocols
     if not is_user_st_protocol(t):
         return False
-    return getattr(t_orig, '_is_runtime_protocol', False)
+    return getattr(get_origin(t) or t, '_is_runtime_protocol', False)
 
 
+@_memoize(maxsize=512)
 def is_abc(t: Type) -> bool:
     t_orig = get_origin(t) or t
     return issubclass(type(t_orig), abc.ABCMeta) and (
@@ -136,7 +127,14 @@ class TypesMatcher(Protocol):
         raise NotImplementedError
 
 
+@_memoize(maxsize=4096)
 def is_type_acceptable_in_place_of(type_acceptable: Type, in_place_of: Type) -> bool:
+    # Result depends only on given types, which are hashable and long-living,
+    # so cache it: same pairs are checked on every resolve
+    # Compare before stripping origins, otherwise any pair of special forms
+    # with the same origin, like `Optional[int]` and `Optional[str]`, matches
+    if type_acceptable is in_place_of:
+        return True
     # Vandally strip subscribed generics to their origins, anyway precise type
     # checking is not supported right now
     type_acceptable = get_origin(type_acceptable) or type_acceptable
@@ -147,6 +145,20 @@ def is_type_acceptable_in_place_of(type_acceptable: Type, in_place_of: Type) ->
     return issubclass(type_acceptable, in_place_of)
 
 
+def clear_type_caches() -> None:
+    """
+    Clear memoized results of types predicates, e.g. after redefining types
+    under the same names in tests or on code reload.
+    """
+    for predicate in (
+        is_user_st_protocol,
+        is_user_st_runtime_protocol,
+        is_abc,
+        is_type_acceptable_in_place_of,
+    ):
+        predicate.cache_clear()
+
+
 def _ensure_types_checkable(type_acceptable: Type, in_place_of: Type) -> None:
     # If `t2` is not parent of `t1`, so in case when right side is not
     # runtime-checkable Protocol, throw according error
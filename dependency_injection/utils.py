@@ -13,18 +13,35 @@ class AwaitableValue(Awaitable[T]):
     actual reason.
     """
 
+    __slots__ = ('_value',)
+
     def __init__(self, value: T):
         self._value = value
 
     def __await__(self) -> Generator[Any, None, T]:
         """
-        Generator which instantly returns provided value without suspending
+        Iterator which instantly returns provided value without suspending
         anything.
         """
-        # Makes this function generator, but never yields
-        if False:
-            yield 1
-        return self._value
+        # Plain iterator instead of generator, so no frame is created per await
+        return _ReadyValueIterator(self._value)  # type: ignore[return-value]
+
+
+class _ReadyValueIterator:
+    """
+    Iterator which stops on first step, with given value as result of `await`.
+    """
+
+    __slots__ = ('_value',)
+
+    def __init__(self, value: Any):
+        self._value = value
+
+    def __iter__(self) -> '_ReadyValueIterator':
+        return self
+
+    def __next__(self) -> Any:
+        raise StopIteration(self._value)
 
 
 ScopeT = TypeVar('ScopeT')
@@ -1,5 +1,6 @@
 import abc
 from typing import Protocol, runtime_checkable
+from unittest.mock import call
 
 
 class A:
@@ -54,3 +55,32 @@ class NominalFooProto(FooProto):
 
 A_INST = A()
 B_INST = B()
+
+
+def tracking_factory(return_value=None, wraps=None):
+    """
+    Plain function factory which records its calls, cheaper than `Mock` for
+    tests which only check calls.
+    """
+    calls = []
+
+    def factory(**kwargs):
+        calls.append(call(**kwargs))
+        return return_value if wraps is None else wraps(**kwargs)
+
+    factory.calls = calls
+    return factory
+
+
+def async_tracking_factory(return_value=None, wraps=None):
+    """
+    Same as `tracking_factory`, but call is recorded only when awaited.
+    """
+    calls = []
+
+    async def factory(**kwargs):
+        calls.append(call(**kwargs))
+        return return_value if wraps is None else wraps(**kwargs)
+
+    factory.calls = calls
+    return factory
@@ -1,4 +1,4 @@
-from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from contextlib import AbstractAsyncContextManager, AbstractContextManager, AsyncExitStack
 from typing import Callable
 from unittest.mock import AsyncMock, MagicMock, Mock, call
 
@@ -7,10 +7,13 @@ from pytest import mark
 from dependency_injection.core import (
     AsyncDependency,
     AsyncImmutableContainer,
+    AsyncImmutableScopedContainers,
+    _LazyFinalizers,
     create_async_resolver,
+    create_scoped_async_resolver,
 )
 from dependency_injection.utils import AwaitableValue
-from tests.helpers import A_INST, A, DepOnA
+from tests.helpers import A_INST, B_INST, A, B, C, DepOnA, async_tracking_factory, tracking_factory
 
 pytestmark = mark.usefixtures('loop')
 
@@ -50,6 +53,9 @@ async def test_memoizes_sync_value_and_still_returns_awaitable():
         v3_awaitable = resolver.resolve('a', A)
         assert isinstance(v3_awaitable, AwaitableValue)
         assert await v3_awaitable is A_INST
+        # Same awaitable is reused for memoized value and could be awaited again
+        assert resolver.resolve('a', A) is v3_awaitable
+        assert await v3_awaitable is A_INST
 
 
 async def test_provides_sync_cm_value():
@@ -89,7 +95,7 @@ async def test_provides_async_value():
 
 
 async def test_memoizes_async_value_and_still_returns_awaitable():
-    a_factory = AsyncMock(Callable, name='a-factory', return_value=A_INST)
+    a_factory = async_tracking_factory(A_INST)
     container = ImmutableContainer({'a': create_dependency('a', A, {}, a_factory)})
 
     async with create_resolver(container) as resolver:
@@ -97,7 +103,7 @@ async def test_memoizes_async_value_and_still_returns_awaitable():
         v2 = await resolver.resolve('a', A)
         assert v1 is A_INST
         assert v2 is A_INST
-        assert a_factory.mock_calls == [call()]
+        assert a_factory.calls == [call()]
 
 
 async def test_provides_async_cm_value():
@@ -123,9 +129,24 @@ async def test_provides_async_cm_value():
     assert a_cm.__aexit__.await_args_list == [call(a_cm, None, None, None)]
 
 
+async def test_finalizers_stack_created_on_demand():
+    callback = AsyncMock(Callable, name='callback')
+    container = ImmutableContainer(
+        {'a': create_dependency('a', A, {}, async_tracking_factory(A_INST))}
+    )
+
+    async with create_resolver(container) as resolver:
+        assert isinstance(resolver.guard, _LazyFinalizers)
+        assert resolver.guard._stack is None
+        assert isinstance(resolver.finalizers_stack, AsyncExitStack)
+        resolver.finalizers_stack.push_async_callback(callback)
+        assert callback.mock_calls == []
+    assert callback.mock_calls == [call()]
+
+
 async def test_async_factory_depends_on_sync():
-    a_factory = Mock(Callable, name='a-factory', return_value=A_INST)
-    dep_on_a_factory = AsyncMock(Callable, name='dep-on-a', wraps=DepOnA)
+    a_factory = tracking_factory(A_INST)
+    dep_on_a_factory = async_tracking_factory(wraps=DepOnA)
     container = ImmutableContainer(
         {
             'a': create_dependency('a', A, {}, a_factory, is_async_factory=False),
@@ -141,14 +162,13 @@ async def test_async_factory_depends_on_sync():
     async with create_resolver(container) as resolver:
         dep_on_a = await resolver.resolve('dep_on_a', DepOnA)
         assert dep_on_a.a is A_INST
-        assert a_factory.mock_calls == [call()]
-        assert dep_on_a_factory.mock_calls == [call(a=A_INST)]
-        assert dep_on_a_factory.await_args_list == [call(a=A_INST)]
+        assert a_factory.calls == [call()]
+        assert dep_on_a_factory.calls == [call(a=A_INST)]
 
 
 async def test_sync_factory_depends_on_async():
-    a_factory = AsyncMock(Callable, name='a-factory', return_value=A_INST)
-    dep_on_a_factory = Mock(Callable, name='dep-on-a', wraps=DepOnA)
+    a_factory = async_tracking_factory(A_INST)
+    dep_on_a_factory = tracking_factory(wraps=DepOnA)
     container = ImmutableContainer(
         {
             'a': create_dependency('a', A, {}, a_factory),
@@ -165,6 +185,62 @@ async def test_sync_factory_depends_on_async():
     async with create_resolver(container) as resolver:
         dep_on_a = await resolver.resolve('dep_on_a', DepOnA)
         assert dep_on_a.a is A_INST
-        assert a_factory.mock_calls == [call()]
-        assert a_factory.await_args_list == [call()]
-        assert dep_on_a_factory.mock_calls == [call(a=A_INST)]
+        assert a_factory.calls == [call()]
+        assert dep_on_a_factory.calls == [call(a=A_INST)]
+
+
+async def test_shared_sub_dependency_created_once():
+    a_factory = async_tracking_factory(A_INST)
+    c_factory = tracking_factory(wraps=C)
+    container = ImmutableContainer(
+        {
+            'a': create_dependency('a', A, {}, a_factory),
+            'dep_on_a': create_dependency(
+                'dep_on_a', DepOnA, {'a': ('a', A)}, DepOnA, is_async_factory=False
+            ),
+            'b': create_dependency(
+                'b', B, {'a': ('a', A)}, lambda a: B_INST, is_async_factory=False
+            ),
+            'c': create_dependency(
+                'c',
+                C,
+                {'a': ('dep_on_a', DepOnA), 'b': ('b', B)},
+                c_factory,
+                is_async_factory=False,
+            ),
+        }
+    )
+
+    async with create_resolver(container) as resolver:
+        c = await resolver.resolve('c', C)
+        assert c.a.a is A_INST
+        assert c.b is B_INST
+        assert a_factory.calls == [call()]
+
+
+async def test_scoped_resolver_resolves_outer_scope_dependencies():
+    a_cm = AsyncMock(AbstractAsyncContextManager, name='a-cm')
+    a_cm.__aenter__.return_value = A_INST
+    scoped_containers = AsyncImmutableScopedContainers(
+        ['app', 'handler'],
+        {
+            'app': ImmutableContainer(
+                {'a': create_dependency('a', A, {}, lambda: a_cm, is_context_manager=True)}
+            ),
+            'handler': ImmutableContainer(
+                {
+                    'dep_on_a': create_dependency(
+                        'dep_on_a', DepOnA, {'a': ('a', A)}, DepOnA, is_async_factory=False
+                    )
+                }
+            ),
+        },
+    )
+
+    async with create_scoped_async_resolver(scoped_containers) as app_resolver:
+        async with app_resolver.next_scope() as handler_resolver:
+            assert (await handler_resolver.resolve('dep_on_a', DepOnA)).a is A_INST
+        # Outer scope dependency is finalized only on outer scope exit
+        assert a_cm.mock_calls == [call.__aenter__(a_cm)]
+
+    assert a_cm.mock_calls == [call.__aenter__(a_cm), call.__aexit__(a_cm, None, None, None)]
@@ -1,22 +1,36 @@
-from contextlib import AbstractContextManager, contextmanager
-from typing import Callable
-from unittest.mock import MagicMock, Mock, call
+import copy
+import pickle
+import sys
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+from enum import Enum
+from typing import Annotated, Callable
+from unittest.mock import MagicMock, Mock, call, patch
 
 from pytest import raises
 
 from dependency_injection.core import (
+    AsyncCallableFactory,
+    AsyncDependency,
+    CyclicDependencyError,
     Dependency,
     ImmutableContainer,
     ImmutableScopedContainers,
     ScopedContainers,
+    compile_container,
     create_resolver,
     create_scoped_resolver,
 )
-from tests.helpers import A_INST, B_INST, A, B, C
+from dependency_injection.types_match import is_type_acceptable_in_place_of
+from tests.helpers import A_INST, B_INST, A, B, C, DepOnA, tracking_factory
 
 create_dependency = Dependency.create
 
 
+class Name(str, Enum):
+    A = 'a'
+    DEP_ON_A = 'dep_on_a'
+
+
 class TestResolver:
     def test_calls_container_types_matcher(self):
         factory = Mock(Callable, name='factory')
@@ -34,15 +48,27 @@ class TestResolver:
         assert value is factory.return_value
         assert types_matcher.mock_calls == [call(provided_type, required_type)]
 
+    def test_skips_default_types_matcher_for_same_type(self):
+        types_matcher = Mock(Callable, wraps=is_type_acceptable_in_place_of)
+        container = ImmutableContainer(
+            {'a': create_dependency('a', A, {}, lambda: A_INST)}, types_matcher=types_matcher
+        )
+
+        # Make the mock be recognized as the default matcher
+        with patch('dependency_injection.core.is_type_acceptable_in_place_of', types_matcher):
+            with create_resolver(container) as resolver:
+                assert resolver.resolve('a', A) is A_INST
+        assert types_matcher.mock_calls == []
+
     def test_provides_simple(self):
-        a_factory = Mock(Callable, name='a-factory', return_value=A_INST)
+        a_factory = tracking_factory(A_INST)
         container = ImmutableContainer(
             {'a': create_dependency('a', A, requires={}, factory=a_factory)}
         )
 
         with create_resolver(container) as resolver:
             assert resolver.resolve('a', A) is A_INST
-        assert a_factory.mock_calls == [call()]
+        assert a_factory.calls == [call()]
 
     def test_created_value_been_memoized_v1(self):
         container = ImmutableContainer({'a': create_dependency('a', A, {}, factory=A)})
@@ -52,18 +78,18 @@ class TestResolver:
             assert a1 is a2
 
     def test_created_value_been_memoized_v2(self):
-        a_factory = Mock(Callable, name='a-factory')
+        a_factory = tracking_factory(A_INST)
         container = ImmutableContainer({'a': create_dependency('a', A, {}, factory=a_factory)})
         with create_resolver(container) as resolver:
             a1 = resolver.resolve('a', A)
             a2 = resolver.resolve('a', A)
-            assert a_factory.mock_calls == [call()]
-            assert a1 is a2 is a_factory.return_value
+            assert a_factory.calls == [call()]
+            assert a1 is a2 is A_INST
 
     def test_provides_with_deps(self):
-        a_factory = Mock(Callable, name='a-factory', return_value=A_INST)
-        b_factory = Mock(Callable, name='b-factory', return_value=B_INST)
-        c_factory = Mock(Callable, name='c-factory', wraps=C)
+        a_factory = tracking_factory(A_INST)
+        b_factory = tracking_factory(B_INST)
+        c_factory = tracking_factory(wraps=C)
         container = ImmutableContainer(
             {
                 'a': create_dependency('a', A, {}, factory=a_factory),
@@ -82,15 +108,15 @@ class TestResolver:
             assert isinstance(c_provided, C)
             assert c_provided.a is A_INST
             assert c_provided.b is B_INST
-            assert a_factory.mock_calls == [call()]
-            assert b_factory.mock_calls == [call()]
-            assert c_factory.mock_calls == [call(a=A_INST, b=B_INST)]
+            assert a_factory.calls == [call()]
+            assert b_factory.calls == [call()]
+            assert c_factory.calls == [call(a=A_INST, b=B_INST)]
 
     def test_provides_dep_by_custom_arg_name(self):
         def c_factory(*, a_arg, b_arg):
             return C(a_arg, b_arg)
 
-        c_factory_mock = Mock(Callable, wraps=c_factory, name='c-factory')
+        c_factory_mock = tracking_factory(wraps=c_factory)
         container = ImmutableContainer(
             {
                 'a': create_dependency('a', A, {}, factory=lambda: A_INST),
@@ -108,7 +134,7 @@ class TestResolver:
             c_inst = resolver.resolve('c', C)
             assert c_inst.a is A_INST
             assert c_inst.b is B_INST
-            assert c_factory_mock.mock_calls == [call(a_arg=A_INST, b_arg=B_INST)]
+            assert c_factory_mock.calls == [call(a_arg=A_INST, b_arg=B_INST)]
 
     def test_context_manager_factory(self):
         a_cm = MagicMock(AbstractContextManager, name='a-cm')
@@ -147,7 +173,7 @@ class TestResolver:
                     'c',
                     C,
                     {'a': ('a', A), 'b': ('b', B)},
-                    factory=Mock(Callable, wraps=C),
+                    factory=C,
                 ),
             }
         )
@@ -157,9 +183,69 @@ class TestResolver:
             assert c.a is A_INST
             assert c.b is B_INST
 
-    def test_there_is_recursion_error_TODO(self):
-        a_factory = Mock(Callable, name='a-factory', return_value=A_INST)
-        b_factory = Mock(Callable, name='b-factory', return_value=B_INST)
+    def test_exit_stack_created_only_for_context_manager_factories(self):
+        with create_resolver(
+            ImmutableContainer({'a': create_dependency('a', A, {}, factory=A)})
+        ) as resolver:
+            assert not isinstance(resolver.guard, ExitStack)
+
+        callback = Mock(Callable, name='callback')
+        with create_resolver(
+            ImmutableContainer({'a': create_dependency('a', A, {}, factory=A)})
+        ) as resolver:
+            # But it is still created on demand
+            assert isinstance(resolver.finalizers_stack, ExitStack)
+            resolver.finalizers_stack.callback(callback)
+            assert callback.mock_calls == []
+        assert callback.mock_calls == [call()]
+
+        with create_resolver(
+            ImmutableContainer(
+                {'a': create_dependency('a', A, {}, factory=MagicMock(), is_context_manager=True)}
+            )
+        ) as resolver:
+            assert isinstance(resolver.finalizers_stack, ExitStack)
+
+    def test_async_factory_not_supported(self):
+        container = ImmutableContainer(
+            {'a': Dependency('a', A, {}, factory=AsyncCallableFactory(Mock(Callable)))}
+        )
+
+        with create_resolver(container) as resolver:
+            with raises(TypeError):
+                resolver.resolve('a', A)
+
+    def test_async_dependency_not_supported(self):
+        container = ImmutableContainer(
+            {
+                'a': AsyncDependency.create('a', A, {}, A, is_async_factory=False),
+                'dep_on_a': create_dependency('dep_on_a', DepOnA, {'a': ('a', A)}, DepOnA),
+            }
+        )
+
+        with create_resolver(container) as resolver:
+            with raises(RuntimeError, match='sync resolver received dependency of other type'):
+                resolver.resolve('a', A)
+            with raises(RuntimeError, match='sync resolver received dependency of other type'):
+                resolver.resolve('dep_on_a', DepOnA)
+
+    def test_resolves_chain_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 1
+        container = ImmutableContainer(
+            {
+                f'a{idx}': create_dependency(
+                    f'a{idx}', A, {'a': (f'a{idx - 1}', A)} if idx else {}, lambda a=None: A()
+                )
+                for idx in range(depth)
+            }
+        )
+
+        with create_resolver(container) as resolver:
+            assert isinstance(resolver.resolve(f'a{depth - 1}', A), A)
+
+    def test_cyclic_dependency_detected(self):
+        a_factory = tracking_factory(A_INST)
+        b_factory = tracking_factory(B_INST)
         container = ImmutableContainer(
             {
                 'a': create_dependency('a', A, {'b': ('b', B)}, a_factory),
@@ -168,8 +254,80 @@ class TestResolver:
         )
 
         with create_resolver(container) as resolver:
-            with raises(RecursionError):
+            with raises(CyclicDependencyError, match='`a` -> `b` -> `a`'):
                 resolver.resolve('a', A)
+        assert a_factory.calls == b_factory.calls == []
+
+    def test_compiled_container_shares_plans_between_resolvers(self):
+        a_factory = tracking_factory(A_INST)
+        container = compile_container(
+            ImmutableContainer(
+                {
+                    'a': create_dependency('a', A, {}, a_factory),
+                    'dep_on_a': create_dependency('dep_on_a', DepOnA, {'a': ('a', A)}, DepOnA),
+                }
+            )
+        )
+        assert compile_container(container) is container
+
+        with create_resolver(container) as resolver:
+            assert resolver.resolve('dep_on_a', DepOnA).a is A_INST
+        plan = container.plans['dep_on_a']
+
+        with create_resolver(container) as resolver:
+            assert resolver.resolve('dep_on_a', DepOnA).a is A_INST
+        assert container.plans['dep_on_a'] is plan
+        # But created values are never shared between resolvers
+        assert a_factory.calls == [call(), call()]
+
+    def test_compiled_container_caches_types_matcher_results(self):
+        types_matcher = Mock(Callable, name='types-matcher', return_value=True)
+        container = compile_container(
+            ImmutableContainer(
+                {'a': create_dependency('a', A, {}, Mock(Callable))},
+                types_matcher=types_matcher,
+            )
+        )
+
+        for _ in range(2):
+            with create_resolver(container) as resolver:
+                resolver.resolve('a', object)
+                resolver.resolve('a', object)
+
+        assert types_matcher.mock_calls == [call(A, object)]
+
+    def test_resolves_dependency_registered_under_other_name(self):
+        a_factory = tracking_factory(A_INST)
+        container = ImmutableContainer(
+            {
+                'a_alias': create_dependency('a', A, {}, a_factory),
+                'dep_on_a': create_dependency('dep_on_a', DepOnA, {'a': ('a_alias', A)}, DepOnA),
+            }
+        )
+
+        with create_resolver(container) as resolver:
+            assert resolver.resolve('dep_on_a', DepOnA).a is A_INST
+            assert resolver.resolve('a_alias', A) is A_INST
+
+        assert a_factory.calls == [call()]
+
+    def test_resolves_unhashable_type(self):
+        annotated_a = Annotated[A, {'key': 'value'}]
+        container = compile_container(
+            ImmutableContainer(
+                {
+                    'a': create_dependency('a', annotated_a, {}, lambda: A_INST),
+                    'dep_on_a': create_dependency(
+                        'dep_on_a', DepOnA, {'a': ('a', Annotated[A, {'key': 'value'}])}, DepOnA
+                    ),
+                }
+            )
+        )
+
+        with create_resolver(container) as resolver:
+            assert resolver.resolve('a', annotated_a) is A_INST
+            assert resolver.resolve('dep_on_a', DepOnA).a is A_INST
+        assert container.lookups.keys() == {('dep_on_a', DepOnA)}
 
 
 class TestScopedResolver:
@@ -261,11 +419,12 @@ class TestScopedResolver:
             },
         )
 
-        with create_scoped_resolver(scoped_containers) as root_resolver:
-            with root_resolver.next_scope() as app_resolver:
-                with app_resolver.next_scope() as handler_resolver:
-                    foo_ctrl = handler_resolver.resolve('foo_ctrl', FooCtrl)
-                    bar_ctrl = handler_resolver.resolve('bar_ctrl', BarCtrl)
+        with ExitStack() as stack:
+            root_resolver = stack.enter_context(create_scoped_resolver(scoped_containers))
+            app_resolver = stack.enter_context(root_resolver.next_scope())
+            handler_resolver = stack.enter_context(app_resolver.next_scope())
+            foo_ctrl = handler_resolver.resolve('foo_ctrl', FooCtrl)
+            bar_ctrl = handler_resolver.resolve('bar_ctrl', BarCtrl)
 
         assert foo_ctrl is foo_ctrl_factory.return_value
         assert bar_ctrl is bar_ctrl_factory.return_value
@@ -283,3 +442,176 @@ class TestScopedResolver:
         assert cache_factory.mock_calls == [call(cfg=cfg_factory.return_value)]
 
         assert cfg_factory.mock_calls == [call()]
+
+    def test_unknown_dependency_not_found_in_any_scope(self):
+        scoped_containers = ImmutableScopedContainers(
+            self.SCOPES_ORDER,
+            {
+                'root': ImmutableContainer({'a': create_dependency('a', A, {}, lambda: A_INST)}),
+                'app': ImmutableContainer({'b': create_dependency('b', B, {}, lambda: B_INST)}),
+                'handler': ImmutableContainer({}),
+            },
+        )
+
+        with create_scoped_resolver(scoped_containers) as root_resolver:
+            # Inner scope dependencies are not visible from the outer scope
+            with raises(LookupError):
+                root_resolver.resolve('b', B)
+
+            with root_resolver.next_scope() as app_resolver:
+                with app_resolver.next_scope() as handler_resolver:
+                    assert handler_resolver.resolve('a', A) is A_INST
+                    assert handler_resolver.resolve('b', B) is B_INST
+                    with raises(LookupError):
+                        handler_resolver.resolve('c', C)
+
+    def test_sub_deps_created_in_declaration_order(self):
+        created = []
+        scoped_containers = ImmutableScopedContainers(
+            self.SCOPES_ORDER,
+            {
+                'root': ImmutableContainer(
+                    {'a': create_dependency('a', A, {}, lambda: created.append('a') or A_INST)}
+                ),
+                'app': ImmutableContainer(
+                    {
+                        'b': create_dependency('b', B, {}, lambda: created.append('b') or B_INST),
+                        'c': create_dependency(
+                            'c',
+                            C,
+                            {'a': ('a', A), 'b': ('b', B)},
+                            lambda a, b: created.append('c') or C(a, b),
+                        ),
+                    }
+                ),
+                'handler': ImmutableContainer({}),
+            },
+        )
+
+        with create_scoped_resolver(scoped_containers) as root_resolver:
+            with root_resolver.next_scope() as app_resolver:
+                app_resolver.resolve('c', C)
+        assert created == ['a', 'b', 'c']
+
+    def test_sub_deps_not_created_after_missing_requirement(self):
+        b_factory = tracking_factory(B_INST)
+        c_factory = tracking_factory(wraps=C)
+        scoped_containers = ImmutableScopedContainers(
+            self.SCOPES_ORDER,
+            {
+                'root': ImmutableContainer({}),
+                'app': ImmutableContainer(
+                    {
+                        'b': create_dependency('b', B, {}, b_factory),
+                        'c': create_dependency('c', C, {'a': ('a', A), 'b': ('b', B)}, c_factory),
+                    }
+                ),
+                'handler': ImmutableContainer({}),
+            },
+        )
+
+        with create_scoped_resolver(scoped_containers) as root_resolver:
+            with root_resolver.next_scope() as app_resolver:
+                with raises(LookupError) as exc_info:
+                    app_resolver.resolve('c', C)
+        assert b_factory.calls == c_factory.calls == []
+        # Cause is chained just like for dependencies resolved directly
+        assert isinstance(exc_info.value.__cause__, LookupError)
+
+    def test_next_scope_validation(self):
+        scoped_containers = ImmutableScopedContainers(
+            self.SCOPES_ORDER,
+            {scope: ImmutableContainer({}) for scope in self.SCOPES_ORDER},
+        )
+
+        with create_scoped_resolver(scoped_containers) as root_resolver:
+            with raises(ValueError):
+                root_resolver.next_scope('handler')
+
+            with root_resolver.next_scope('app') as app_resolver:
+                with app_resolver.next_scope() as handler_resolver:
+                    assert handler_resolver.scope == 'handler'
+                    with raises(ValueError):
+                        handler_resolver.next_scope()
+
+    def test_inner_scope_overrides_outer_scope_dependency(self):
+        a_inner = A()
+        scoped_containers = ImmutableScopedContainers(
+            self.SCOPES_ORDER,
+            {
+                'root': ImmutableContainer({'a': create_dependency('a', A, {}, lambda: A_INST)}),
+                'app': ImmutableContainer({}),
+                'handler': ImmutableContainer(
+                    {
+                        'a': create_dependency('a', A, {}, lambda: a_inner),
+                        'dep_on_a': create_dependency('dep_on_a', DepOnA, {'a': ('a', A)}, DepOnA),
+                    }
+                ),
+            },
+        )
+
+        with create_scoped_resolver(scoped_containers) as root_resolver:
+            with root_resolver.next_scope() as app_resolver:
+                assert app_resolver.resolve('a', A) is A_INST
+                with app_resolver.next_scope() as handler_resolver:
+                    assert handler_resolver.resolve('a', A) is a_inner
+                    assert handler_resolver.resolve('dep_on_a', DepOnA).a is a_inner
+
+
+def test_dependency_can_be_copied():
+    dep = create_dependency('dep_on_a', DepOnA, {'a': ('a', A)}, DepOnA)
+
+    assert copy.deepcopy(dep) == dep
+    assert pickle.loads(pickle.dumps(dep)) == dep
+
+
+def test_dependency_created_with_str_subclass_names():
+    dep = create_dependency(Name.DEP_ON_A, DepOnA, {Name.A: (Name.A, A)}, DepOnA)
+
+    assert dep.name is Name.DEP_ON_A
+    assert dep.requires == {Name.A: (Name.A, A)}
+
+
+def test_resolves_from_container_keyed_by_str_subclass():
+    container = ImmutableContainer(
+        {
+            Name.A: create_dependency(Name.A, A, {}, lambda: A_INST),
+            Name.DEP_ON_A: create_dependency(Name.DEP_ON_A, DepOnA, {'a': (Name.A, A)}, DepOnA),
+        }
+    )
+
+    with create_resolver(container) as resolver:
+        assert resolver.resolve(Name.DEP_ON_A, DepOnA).a is A_INST
+        assert resolver.resolve('a', A) is A_INST
+
+
+def test_compiled_container_can_be_copied():
+    container = compile_container(
+        ImmutableContainer(
+            {
+                'a': create_dependency('a', A, {}, A),
+                'dep_on_a': create_dependency('dep_on_a', DepOnA, {'a': ('a', A)}, DepOnA),
+            }
+        )
+    )
+    with create_resolver(container) as resolver:
+        resolver.resolve('dep_on_a', DepOnA)
+
+    assert copy.deepcopy(container) == container
+    assert pickle.loads(pickle.dumps(container)) == container
+
+
+def test_dependency_keeps_requirements_of_other_forms():
+    dep = create_dependency('dep_on_a', DepOnA, {'a': A}, DepOnA)
+
+    assert dep.requires == {'a': A}
+
+
+def test_compiled_container_provides_is_read_only():
+    provides = {'a': create_dependency('a', A, {}, A)}
+    container = compile_container(ImmutableContainer(provides))
+    provides['b'] = create_dependency('b', B, {}, B)
+
+    with raises(TypeError):
+        container.provides['b'] = provides['b']
+    assert container.provides.keys() == {'a'}
@@ -1,9 +1,22 @@
 import abc
-from typing import Dict, Generic, Mapping, Protocol, Sequence, TypeVar, runtime_checkable
+from typing import (
+    Annotated,
+    Dict,
+    Generic,
+    Literal,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    TypeVar,
+    Union,
+    runtime_checkable,
+)
 
 from pytest import mark
 
 from dependency_injection.types_match import (
+    clear_type_caches,
     is_abc,
     is_type_acceptable_in_place_of,
     is_user_st_protocol,
@@ -40,17 +53,24 @@ class GenericABCClass(abc.ABC, Generic[T]):
     pass
 
 
+GENERIC_PROTO_INT = GenericProto[int]
+GENERIC_RUNTIME_PROTO_INT = GenericRuntimeProto[int]
+GENERIC_ABC_CLASS_INT = GenericABCClass[int]
+SEQUENCE_INT = Sequence[int]
+DICT_STR_STR = Dict[str, str]
+
+
 @mark.parametrize(
     'maybe_abc, excepted_result',
     [
         (Protocol, False),
         (Protocol[T], False),
         (Proto, False),
-        (GenericProto[int], False),
+        (GENERIC_PROTO_INT, False),
         (RuntimeProto, False),
-        (GenericRuntimeProto[int], False),
+        (GENERIC_RUNTIME_PROTO_INT, False),
         (ABCClass, True),
-        (GenericABCClass[int], True),
+        (GENERIC_ABC_CLASS_INT, True),
     ],
 )
 def test_is_abc(maybe_abc, excepted_result):
@@ -62,11 +82,11 @@ def test_is_abc(maybe_abc, excepted_result):
     [
         (Protocol, False),
         (Proto, True),
-        (GenericProto[int], True),
+        (GENERIC_PROTO_INT, True),
         (RuntimeProto, True),
-        (GenericRuntimeProto[int], True),
+        (GENERIC_RUNTIME_PROTO_INT, True),
         (ABCClass, False),
-        (GenericABCClass[int], False),
+        (GENERIC_ABC_CLASS_INT, False),
     ]
     +
     # All generic standard library aliases should not be recognized as
@@ -78,8 +98,8 @@ def test_is_abc(maybe_abc, excepted_result):
             Sequence,
             Dict,
             Mapping,
-            Sequence[int],
-            Dict[str, str],
+            SEQUENCE_INT,
+            DICT_STR_STR,
         ]
     ],
 )
@@ -94,11 +114,11 @@ def test_is_user_st_protocol(maybe_proto, excepted_result):
         (Protocol, False),
         (Protocol[T], False),
         (Proto, False),
-        (GenericProto[int], False),
+        (GENERIC_PROTO_INT, False),
         (RuntimeProto, True),
-        (GenericRuntimeProto[int], True),
+        (GENERIC_RUNTIME_PROTO_INT, True),
         (ABCClass, False),
-        (GenericABCClass[int], False),
+        (GENERIC_ABC_CLASS_INT, False),
     ],
 )
 def test_is_user_st_runtime_protocol(maybe_abc, excepted_result):
@@ -115,6 +135,8 @@ def test_is_user_st_runtime_protocol(maybe_abc, excepted_result):
         (FooInheritor, Foo, True),
         (FooInheritor, FooProto, True),
         (NominalFooABC, FooABC, True),
+        # Identical special forms are accepted without stripping origins
+        (Optional[int], Optional[int], True),
         # `abc.ABC` doesn't support structural typing, and we do so
         # (maybe will be altered in future)
         (
@@ -131,3 +153,43 @@ def test_is_user_st_runtime_protocol(maybe_abc, excepted_result):
 )
 def test_types_consistency(type_acceptable, in_place_of, is_match):
     assert is_type_acceptable_in_place_of(type_acceptable, in_place_of) is is_match
+
+
+@mark.parametrize(
+    'type_acceptable, in_place_of',
+    [
+        (Optional[int], Optional[str]),
+        (Union[int, str], Union[bytes, float]),
+        (Literal[1], Literal[2]),
+    ],
+)
+@mark.xfail(reason='special forms share origin, which is not a class')
+def test_types_consistency_special_forms_not_supported(type_acceptable, in_place_of):
+    assert is_type_acceptable_in_place_of(type_acceptable, in_place_of) is False
+
+
+def test_types_consistency_is_cached():
+    clear_type_caches()
+    assert is_type_acceptable_in_place_of(FooInheritor, Foo)
+    assert is_type_acceptable_in_place_of(FooInheritor, Foo)
+    cache_info = is_type_acceptable_in_place_of.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+
+@mark.parametrize('predicate', [is_abc, is_user_st_protocol, is_user_st_runtime_protocol])
+def test_predicates_of_unhashable_types(predicate):
+    unhashable_type = Annotated[int, {'key': 'value'}]
+    assert predicate(unhashable_type) is predicate.__wrapped__(unhashable_type)
+
+
+def test_types_consistency_of_unhashable_types():
+    unhashable_type = Annotated[Foo, {'key': 'value'}]
+    assert is_type_acceptable_in_place_of(unhashable_type, unhashable_type)
+
+
+def test_clear_type_caches():
+    assert is_abc(ABCClass)
+    clear_type_caches()
+    assert is_abc.cache_info().currsize == 0
+    assert is_type_acceptable_in_place_of.cache_info().currsize == 0